@@ -22,14 +22,21 @@ from biosimulators_utils.warnings import warn, BioSimulatorsWarning
 from kisao.data_model import AlgorithmSubstitutionPolicy, ALGORITHM_SUBSTITUTION_POLICY_LEVELS
 from kisao.utils import get_preferred_substitute_algorithm_by_ids
 import gillespy2
+import lxml.etree
 import math
 import numpy
 import functools
+import os
+import pickle
+import re
 
 __all__ = [
     'exec_sedml_docs_in_combine_archive', 'exec_sed_task',
 ]
 
+# canonical form of XPaths to species, e.g., ``/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='X']``
+_SPECIES_TARGET_PATTERN = re.compile(r'^/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species\[@id=([\'"])([^\'"]+)\1\]$')
+
 
 def exec_sedml_docs_in_combine_archive(archive_filename, out_dir,
                                        report_formats=None, plot_formats=None,
@@ -83,6 +90,91 @@ def exec_sed_task(task, variables, log=None):
     '''
     log = log or TaskLog()
 
+    exec_kisao_id, algorithm, algorithm_params, number_of_points = _validate_sed_task(task, variables)
+    simulation = task.simulation
+
+    # Read the SBML-encoded model located at `task.model.source`
+    model, errors = _sbml_to_gillespy_cached(task.model.source)
+    if model is None or errors:
+        raise ValueError('Model at {} could not be imported:\n  - {}'.format(
+            task.model.source, '\n  - '.join(message for message, code in errors)))
+
+    # Resolve the ids of the species targeted by the variables
+    target_x_paths_ids = _get_variable_target_ids(variables, task.model.source, model.get_all_species().keys())
+
+    solver = algorithm.solver
+    if solver == gillespy2.SSACSolver and (model.get_all_events() or model.get_all_assignment_rules()):
+        solver = gillespy2.NumPySSASolver
+
+    # set the simulation time span
+    model.timespan(numpy.linspace(simulation.initial_time, simulation.output_end_time, number_of_points + 1))
+
+    # determine allowed variable targets
+    predicted_ids = list(model.get_all_species().keys())
+    unpredicted_targets = set()
+    for variable in variables:
+        if not variable.symbol:
+            if target_x_paths_ids[variable.target] not in predicted_ids:
+                unpredicted_targets.add(variable.target)
+
+    if unpredicted_targets:
+        raise ValueError(''.join([
+            'The following variable targets could not be recorded:\n  - {}\n\n'.format(
+                '\n  - '.join(sorted(unpredicted_targets)),
+            ),
+            'Targets must have one of the following ids:\n  - {}'.format(
+                '\n  - '.join(sorted(predicted_ids)),
+            ),
+        ]))
+
+    # Simulate the model from ``simulation.start_time`` to ``simulation.output_end_time``
+    # and record ``simulation.number_of_points`` + 1 time points
+    solver_instance = _get_solver_instance(solver, task.model.source)
+    solver_args = dict(**algorithm.solver_args, **algorithm_params)
+    if solver_instance is not solver and solver_args.get('seed', None) is None:
+        # compiled solvers seed themselves with the current time in seconds; give each run its own seed
+        solver_args['seed'] = int(numpy.random.randint(1, 2 ** 31 - 1))
+    results_dict = model.run(solver_instance, **solver_args)[0]
+
+    # transform the results to an instance of :obj:`VariableResults`
+    variable_results = VariableResults()
+    for variable in variables:
+        if variable.symbol:
+            variable_results[variable.id] = results_dict['time'][-(simulation.number_of_points + 1):]
+
+        elif variable.target:
+            variable_results[variable.id] = results_dict[target_x_paths_ids[variable.target]][-(simulation.number_of_points + 1):]
+
+    # log action
+    log.algorithm = exec_kisao_id
+    log.simulator_details = {
+        'method': solver.__module__ + '.' + solver.__name__,
+        'arguments': solver_args,
+    }
+
+    # return results and log
+    return variable_results, log
+
+
+def _validate_sed_task(task, variables):
+    ''' Validate that a task and its variables can be executed, without reading the model
+
+    Args:
+       task (:obj:`Task`): task
+       variables (:obj:`list` of :obj:`Variable`): variables that should be recorded
+
+    Returns:
+        :obj:`tuple`:
+
+            :obj:`str`: KiSAO id of the algorithm that should be executed
+            :obj:`Algorithm`: algorithm that should be executed
+            :obj:`dict`: arguments for the algorithm's solver
+            :obj:`int`: number of time points from the initial time to the output end time
+
+    Raises:
+        :obj:`ValueError`: if the task or an aspect of the task is not valid
+        :obj:`NotImplementedError`: if the task is not of a supported type or involves an unsuported feature
+    '''
     model = task.model
     sim = task.simulation
 
@@ -100,13 +192,6 @@ def exec_sed_task(task, variables, log=None):
                           error_summary='Simulation `{}` is invalid.'.format(sim.id))
     raise_errors_warnings(*validation.validate_data_generator_variables(variables),
                           error_summary='Data generator variables for task `{}` are invalid.'.format(task.id))
-    target_x_paths_ids = validation.validate_variable_xpaths(variables, task.model.source, attr='id')
-
-    # Read the SBML-encoded model located at `task.model.source`
-    model, errors = gillespy2.import_SBML(task.model.source)
-    if model is None or errors:
-        raise ValueError('Model at {} could not be imported:\n  - {}'.format(
-            task.model.source, '\n  - '.join(message for message, code in errors)))
 
     # Load the algorithm specified by `simulation.algorithm`
     simulation = task.simulation
@@ -117,10 +202,6 @@ def exec_sed_task(task, variables, log=None):
         substitution_policy=algorithm_substitution_policy)
     algorithm = KISAO_ALGORITHM_MAP[exec_kisao_id]
 
-    solver = algorithm.solver
-    if solver == gillespy2.SSACSolver and (model.get_all_events() or model.get_all_assignment_rules()):
-        solver = gillespy2.NumPySSASolver
-
     # Apply the algorithm parameter changes specified by `simulation.algorithm.parameter_changes`
     algorithm_params = {}
     if exec_kisao_id == algorithm_kisao_id:
@@ -162,26 +243,18 @@ def exec_sed_task(task, variables, log=None):
     if simulation.initial_time != 0:
         raise NotImplementedError('Initial simulation time {} is not supported. Initial time must be 0.'.format(simulation.initial_time))
 
-    # set the simulation time span
+    # Validate that the time course has an integer number of time points
     number_of_points = (simulation.output_end_time - simulation.initial_time) / \
         (simulation.output_end_time - simulation.output_start_time) * simulation.number_of_points
     if number_of_points != math.floor(number_of_points):
         raise NotImplementedError('Time course must specify an integer number of time points')
     number_of_points = int(number_of_points)
-    model.timespan(numpy.linspace(simulation.initial_time, simulation.output_end_time, number_of_points + 1))
 
-    # determine allowed variable targets
-    predicted_ids = list(model.get_all_species().keys())
+    # Validate that the only symbol that is recorded is time
     unpredicted_symbols = set()
-    unpredicted_targets = set()
     for variable in variables:
-        if variable.symbol:
-            if variable.symbol != Symbol.time:
-                unpredicted_symbols.add(variable.symbol)
-
-        else:
-            if target_x_paths_ids[variable.target] not in predicted_ids:
-                unpredicted_targets.add(variable.target)
+        if variable.symbol and variable.symbol != Symbol.time:
+            unpredicted_symbols.add(variable.symbol)
 
     if unpredicted_symbols:
         raise NotImplementedError("".join([
@@ -191,35 +264,180 @@ def exec_sed_task(task, variables, log=None):
             "Symbols must be one of the following:\n  - {}".format(Symbol.time),
         ]))
 
-    if unpredicted_targets:
-        raise ValueError(''.join([
-            'The following variable targets could not be recorded:\n  - {}\n\n'.format(
-                '\n  - '.join(sorted(unpredicted_targets)),
-            ),
-            'Targets must have one of the following ids:\n  - {}'.format(
-                '\n  - '.join(sorted(predicted_ids)),
-            ),
-        ]))
+    return exec_kisao_id, algorithm, algorithm_params, number_of_points
 
-    # Simulate the model from ``simulation.start_time`` to ``simulation.output_end_time``
-    # and record ``simulation.number_of_points`` + 1 time points
-    results_dict = model.run(solver, **algorithm.solver_args, **algorithm_params)[0]
 
-    # transform the results to an instance of :obj:`VariableResults`
-    variable_results = VariableResults()
-    for variable in variables:
-        if variable.symbol:
-            variable_results[variable.id] = results_dict['time'][-(simulation.number_of_points + 1):]
+def _sbml_to_gillespy_cached(source):
+    """ Import an SBML-encoded model into GillesPy2, reusing the result of previous imports of the same file
 
-        elif variable.target:
-            variable_results[variable.id] = results_dict[target_x_paths_ids[variable.target]][-(simulation.number_of_points + 1):]
+    The cache is keyed on the absolute path, modification time, and size of the file, so that edited files
+    (e.g., models to which changes have been applied) are re-imported. The cache holds pickled models, and each
+    call unpickles an independent copy because executing a task modifies the model (e.g., its time span).
 
-    # log action
-    log.algorithm = exec_kisao_id
-    log.simulator_details = {
-        'method': solver.__module__ + '.' + solver.__name__,
-        'arguments': dict(**algorithm.solver_args, **algorithm_params),
-    }
+    Args:
+        source (:obj:`str`): path to the SBML-encoded model
 
-    # return results and log
-    return variable_results, log
+    Returns:
+        :obj:`tuple`:
+
+            * :obj:`gillespy2.Model`: model, or :obj:`None` if the model could not be imported
+            * :obj:`list` of :obj:`tuple`: errors
+    """
+    key = _get_file_cache_key(source)
+    if key is None:
+        return gillespy2.import_SBML(source)
+
+    pickled_model, errors, _ = _import_sbml(*key)
+    if pickled_model is None:
+        return None, errors
+    return pickle.loads(pickled_model), errors
+
+
+def _get_sbml_namespace_cached(source):
+    """ Get the namespace of the root element of an SBML-encoded model which was imported by
+    :obj:`_sbml_to_gillespy_cached`
+
+    Args:
+        source (:obj:`str`): path to the SBML-encoded model
+
+    Returns:
+        :obj:`str`: namespace, or :obj:`None` if the model could not be imported or its imports are not cached
+    """
+    key = _get_file_cache_key(source)
+    if key is None:
+        return None
+    return _import_sbml(*key)[2]
+
+
+@functools.lru_cache(maxsize=32)
+def _import_sbml(filename, mtime, size):
+    """ Import an SBML-encoded model into GillesPy2, pickle it, and record the namespace of its root element
+
+    Args:
+        filename (:obj:`str`): absolute path to the SBML-encoded model
+        mtime (:obj:`int`): modification time of the file in nanoseconds
+        size (:obj:`int`): size of the file in bytes
+
+    Returns:
+        :obj:`tuple`:
+
+            * :obj:`bytes`: pickled model, or :obj:`None` if the model could not be imported
+            * :obj:`list` of :obj:`tuple`: errors
+            * :obj:`str`: namespace of the root element of the model, or :obj:`None` if the model could not be imported
+    """
+    model, errors = gillespy2.import_SBML(filename)
+    if model is None:
+        return None, errors, None
+
+    namespace = None
+    for _, root in lxml.etree.iterparse(filename, events=('start',)):
+        namespace = lxml.etree.QName(root).namespace
+        break
+
+    return pickle.dumps(model, protocol=5), errors, namespace
+
+
+def _get_solver_instance(solver, source):
+    """ Get the solver to pass to :obj:`gillespy2.Model.run` for a model
+
+    The C++ SSA solver compiles each model into an executable. Because the executable receives the initial
+    values of the species and the values of the parameters at run time, compiled solvers are reused across
+    executions of the same, unmodified model file. Other solvers are returned as is.
+
+    Args:
+        solver (:obj:`type`): solver
+        source (:obj:`str`): path to the SBML-encoded model
+
+    Returns:
+        :obj:`type` or :obj:`gillespy2.GillesPySolver`: solver or compiled instance of the solver
+    """
+    if solver == gillespy2.SSACSolver:
+        key = _get_file_cache_key(source)
+        if key is not None:
+            return _compile_ssa_c_solver(*key)
+    return solver
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_ssa_c_solver(filename, mtime, size):
+    """ Compile the C++ SSA solver for an SBML-encoded model
+
+    Args:
+        filename (:obj:`str`): absolute path to the SBML-encoded model
+        mtime (:obj:`int`): modification time of the file in nanoseconds
+        size (:obj:`int`): size of the file in bytes
+
+    Returns:
+        :obj:`gillespy2.SSACSolver`: compiled solver
+    """
+    pickled_model, _, _ = _import_sbml(filename, mtime, size)
+    return gillespy2.SSACSolver(model=pickle.loads(pickled_model))
+
+
+def _get_file_cache_key(filename):
+    """ Get a key for caching the results of processing a file, which changes when the file is modified
+
+    Args:
+        filename (:obj:`str`): path to the file
+
+    Returns:
+        :obj:`tuple`: absolute path, modification time in nanoseconds, and size of the file, or :obj:`None`
+            if the file could not be read
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+
+def _get_variable_target_ids(variables, model_source, species_ids):
+    """ Get the ids of the objects targeted by variables
+
+    Targets in the canonical form ``/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='...']``, whose
+    ``sbml`` prefix is mapped to the namespace of the model, are resolved with a regular expression. If any target
+    is not in this form or does not refer to a species of the model, all of the targets are resolved by evaluating
+    their XPaths against the model file.
+
+    Args:
+        variables (:obj:`list` of :obj:`Variable`): variables
+        model_source (:obj:`str`): path to the SBML-encoded model
+        species_ids (:obj:`collections.abc.Container` of :obj:`str`): ids of the species of the model
+
+    Returns:
+        :obj:`dict` of :obj:`str` to :obj:`str`: dictionary that maps each target to the id of the object that it
+            references
+    """
+    model_namespace = _get_sbml_namespace_cached(model_source)
+
+    target_ids = {}
+    for variable in variables:
+        if variable.target:
+            namespace = (variable.target_namespaces or {}).get('sbml', None)
+            species_id = _get_species_id_from_target(variable.target)
+            if (
+                model_namespace is None
+                or namespace != model_namespace
+                or species_id is None
+                or species_id not in species_ids
+            ):
+                return validation.validate_variable_xpaths(variables, model_source, attr='id')
+            target_ids[variable.target] = species_id
+    return target_ids
+
+
+@functools.lru_cache(maxsize=None)
+def _get_species_id_from_target(target):
+    """ Get the id of the species referenced by a target in the canonical form
+    ``/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='...']``
+
+    Args:
+        target (:obj:`str`): target
+
+    Returns:
+        :obj:`str`: id of the species, or :obj:`None` if the target is not in the canonical form
+    """
+    match = _SPECIES_TARGET_PATTERN.match(target)
+    if match:
+        return match.group(2)
+    return None
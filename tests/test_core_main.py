@@ -11,7 +11,7 @@ from biosimulators_gillespy2 import core
 from biosimulators_gillespy2.data_model import KISAO_ALGORITHM_MAP
 from biosimulators_utils.archive.io import ArchiveReader
 from biosimulators_utils.combine import data_model as combine_data_model
-from biosimulators_utils.combine.io import CombineArchiveWriter
+from biosimulators_utils.config import get_config
 from biosimulators_utils.log.data_model import TaskLog
 from biosimulators_utils.report import data_model as report_data_model
 from biosimulators_utils.report.io import ReportReader
@@ -24,15 +24,176 @@ from biosimulators_utils.utils.core import are_lists_equal
 from biosimulators_utils.warnings import BioSimulatorsWarning
 from kisao.exceptions import AlgorithmCannotBeSubstitutedException
 from unittest import mock
+import concurrent.futures
+import contextlib
+import copy
 import enum
-import datetime
-import dateutil.tz
+import functools
+import gillespy2
+import h5py
 import numpy
 import numpy.testing
 import os
 import shutil
+import subprocess
 import tempfile
 import unittest
+import zipfile
+
+
+TARGET_BE = "/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='BE']"
+TARGET_CDH1 = '/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id="Cdh1"]'
+TARGET_CDC20 = "/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='Cdc20']"
+
+MANIFEST_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<omexManifest xmlns="http://identifiers.org/combine.specifications/omex-manifest">\n'
+    '  <content location="." format="http://identifiers.org/combine.specifications/omex"/>\n'
+    '{}\n'
+    '</omexManifest>\n'
+)
+
+
+def _exec_combine_archive(archive_filename, out_dir):
+    """ Execute a COMBINE/OMEX archive with the HDF5 and CSV report formats
+
+    Defined at the module level so that it can be dispatched to worker processes.
+
+    Args:
+        archive_filename (:obj:`str`): path to COMBINE/OMEX archive
+        out_dir (:obj:`str`): path to store the outputs of the archive
+
+    Returns:
+        :obj:`str`: path to the outputs of the archive
+    """
+    core.exec_sedml_docs_in_combine_archive(archive_filename, out_dir,
+                                            report_formats=[
+                                                report_data_model.ReportFormat.h5,
+                                                report_data_model.ReportFormat.csv,
+                                            ],
+                                            bundle_outputs=True,
+                                            keep_individual_outputs=True)
+    return out_dir
+
+
+@contextlib.contextmanager
+def _open_reports(out_dir):
+    """ Open the HDF5 file of reports of a COMBINE/OMEX archive once, so that multiple reports can be read through the same handle
+
+    Args:
+        out_dir (:obj:`str`): path to the outputs of the archive
+
+    Yields:
+        :obj:`h5py.File`: HDF5 file
+    """
+    filename = os.path.join(out_dir, get_config().H5_REPORTS_PATH)
+    with h5py.File(filename, 'r', libver='latest', rdcc_nbytes=16 << 20) as file:
+        yield file
+
+
+def _read_h5_report(reports_file, rel_path):
+    """ Read a report from an open HDF5 file of reports
+
+    Args:
+        reports_file (:obj:`h5py.File`): HDF5 file
+        rel_path (:obj:`str`): path to the report within the file
+
+    Returns:
+        :obj:`dict`: dictionary that maps the id of each data set to its values
+    """
+    data_set = reports_file[rel_path]
+    return dict(zip(data_set.attrs['sedmlDataSetIds'], data_set[()]))
+
+
+def _read_report_row(reports_file, rel_path, data_set_id):
+    """ Read the values of one data set of a report from an open HDF5 file of reports, without reading the
+    other data sets of the report
+
+    Args:
+        reports_file (:obj:`h5py.File`): HDF5 file
+        rel_path (:obj:`str`): path to the report within the file
+        data_set_id (:obj:`str`): id of the data set
+
+    Returns:
+        :obj:`numpy.ndarray`: values of the data set
+    """
+    data_set = reports_file[rel_path]
+    i_row = list(data_set.attrs['sedmlDataSetIds']).index(data_set_id)
+    return data_set[i_row, :].astype(numpy.float64)
+
+
+def _relative_tree(root):
+    """ Get the paths of all of the files within a directory
+
+    Args:
+        root (:obj:`str`): path to the directory
+
+    Returns:
+        :obj:`frozenset` of :obj:`str`: paths of the files relative to :obj:`root`, separated by ``/``
+    """
+    paths = set()
+    rel_dirs = ['']
+    while rel_dirs:
+        rel_dir = rel_dirs.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    rel_dirs.append(rel_dir + entry.name + '/')
+                else:
+                    paths.add(rel_dir + entry.name)
+    return frozenset(paths)
+
+
+@functools.lru_cache(maxsize=None)
+def _linspace(start, stop, num):
+    """ Get evenly spaced time points, reusing the array for repeated simulation configurations
+
+    Args:
+        start (:obj:`float`): first time point
+        stop (:obj:`float`): last time point
+        num (:obj:`int`): number of time points
+
+    Returns:
+        :obj:`numpy.ndarray`: read-only array of time points
+    """
+    times = numpy.linspace(start, stop, num, dtype=numpy.float64)
+    times.flags.writeable = False
+    return times
+
+
+def _link_or_copy(src, dst):
+    """ Hard link a file, or copy it if the source and destination are on different file systems
+
+    If :obj:`dst` is already :obj:`src` (e.g., a link placed by a previous call), it is left as is. Any other existing
+    file at :obj:`dst` is removed first so that copying never writes through an existing link to :obj:`src`.
+
+    Args:
+        src (:obj:`str`): path to the file
+        dst (:obj:`str`): path to link or copy the file to
+    """
+    if os.path.lexists(dst):
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+@functools.lru_cache(maxsize=None)
+def _docker_available():
+    """ Determine whether Docker is installed and its daemon is running
+
+    Returns:
+        :obj:`bool`: :obj:`True` if Docker is available
+    """
+    if not shutil.which('docker'):
+        return False
+    try:
+        return subprocess.run(['docker', 'info'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10).returncode == 0
+    except subprocess.TimeoutExpired:
+        return False
 
 
 class TestCase(unittest.TestCase):
@@ -41,8 +202,24 @@ class TestCase(unittest.TestCase):
         'sbml': 'http://www.sbml.org/sbml/level2/version4',
     }
 
+    @classmethod
+    def setUpClass(cls):
+        # keep temporary files in memory when a tmpfs is available
+        if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+            root = '/dev/shm'
+        else:
+            root = tempfile.gettempdir()
+        cls._root = tempfile.mkdtemp(dir=root)
+
+        cls._algorithms = gen_algorithms_from_specs(os.path.join(os.path.dirname(__file__), '..', 'biosimulators.json'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._cached_default_archive.cache_clear()
+        shutil.rmtree(cls._root)
+
     def setUp(self):
-        self.dirname = tempfile.mkdtemp()
+        self.dirname = tempfile.mkdtemp(dir=self._root)
 
     def tearDown(self):
         shutil.rmtree(self.dirname)
@@ -79,19 +256,19 @@ class TestCase(unittest.TestCase):
             ),
             sedml_data_model.Variable(
                 id='BE',
-                target="/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='BE']",
+                target=TARGET_BE,
                 target_namespaces=self.NAMESPACES,
                 task=task,
             ),
             sedml_data_model.Variable(
                 id='Cdh1',
-                target='/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id="Cdh1"]',
+                target=TARGET_CDH1,
                 target_namespaces=self.NAMESPACES,
                 task=task,
             ),
             sedml_data_model.Variable(
                 id='Cdc20',
-                target="/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='Cdc20']",
+                target=TARGET_CDC20,
                 target_namespaces=self.NAMESPACES,
                 task=task,
             ),
@@ -101,123 +278,188 @@ class TestCase(unittest.TestCase):
 
         self.assertTrue(sorted(variable_results.keys()), sorted([var.id for var in variables]))
         self.assertEqual(variable_results[variables[0].id].shape, (task.simulation.number_of_points + 1,))
-        numpy.testing.assert_almost_equal(
-            variable_results['time'],
-            numpy.linspace(task.simulation.output_start_time, task.simulation.output_end_time, task.simulation.number_of_points + 1),
-        )
+        numpy.testing.assert_allclose(variable_results['time'], self._expected_time(task.simulation), rtol=0, atol=1e-7)
         for variable in variables:
             self.assertFalse(numpy.any(numpy.isnan(variable_results[variable.id])))
 
-    def test_exec_sed_task_errors(self):
-        with mock.patch.dict('os.environ', {'ALGORITHM_SUBSTITUTION_POLICY': 'NONE'}):
-            task = sedml_data_model.Task()
-            task.model = sedml_data_model.Model(id='model')
-            task.model.source = os.path.join(self.dirname, 'valid-model.xml')
-            with open(task.model.source, 'w') as file:
-                file.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>')
-                file.write('<sbml2 xmlns="http://www.sbml.org/sbml/level2/version4" level="2" version="4">')
-                file.write('  <model id="model">')
-                file.write('  </model>')
-                file.write('</sbml2>')
-            task.model.language = sedml_data_model.ModelLanguage.SBML
-            task.model.changes = []
-            task.simulation = sedml_data_model.UniformTimeCourseSimulation(
+    def test_sbml_to_gillespy_cached(self):
+        filename = os.path.join(self.dirname, 'model.xml')
+        shutil.copyfile(
+            os.path.join(os.path.dirname(__file__), 'fixtures', 'BIOMD0000000297.edited', 'ex1', 'BIOMD0000000297.xml'),
+            filename)
+
+        model_1, errors = core._sbml_to_gillespy_cached(filename)
+        self.assertEqual(errors, [])
+        model_2, errors = core._sbml_to_gillespy_cached(filename)
+        self.assertEqual(errors, [])
+        self.assertIsNot(model_1, model_2)
+        self.assertEqual(sorted(model_1.get_all_species().keys()), sorted(model_2.get_all_species().keys()))
+
+        with open(filename, 'w') as file:
+            file.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>')
+        model_3, errors = core._sbml_to_gillespy_cached(filename)
+        self.assertEqual(model_3, None)
+        self.assertNotEqual(errors, [])
+
+    def test_get_solver_instance(self):
+        filename = os.path.join(self.dirname, 'model.xml')
+        with open(filename, 'w') as file:
+            file.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>')
+            file.write('<sbml xmlns="http://www.sbml.org/sbml/level2/version4" level="2" version="4">')
+            file.write('  <model id="model">')
+            file.write('    <listOfCompartments><compartment id="c" size="1"/></listOfCompartments>')
+            file.write('    <listOfSpecies>')
+            file.write('      <species id="A" compartment="c" initialAmount="100" hasOnlySubstanceUnits="true"/>')
+            file.write('    </listOfSpecies>')
+            file.write('    <listOfParameters><parameter id="k" value="0.5"/></listOfParameters>')
+            file.write('    <listOfReactions>')
+            file.write('      <reaction id="R1" reversible="false">')
+            file.write('        <listOfReactants><speciesReference species="A"/></listOfReactants>')
+            file.write('        <kineticLaw><math xmlns="http://www.w3.org/1998/Math/MathML">')
+            file.write('          <apply><times/><ci>k</ci><ci>A</ci></apply>')
+            file.write('        </math></kineticLaw>')
+            file.write('      </reaction>')
+            file.write('    </listOfReactions>')
+            file.write('  </model>')
+            file.write('</sbml>')
+
+        solver = core._get_solver_instance(gillespy2.SSACSolver, filename)
+        self.assertIsInstance(solver, gillespy2.SSACSolver)
+        self.assertIs(core._get_solver_instance(gillespy2.SSACSolver, filename), solver)
+
+        self.assertIs(core._get_solver_instance(gillespy2.NumPySSASolver, filename), gillespy2.NumPySSASolver)
+
+        # the seed drawn for the compiled solver is logged so that the run can be reproduced
+        task = sedml_data_model.Task(
+            id='task',
+            model=sedml_data_model.Model(id='model', source=filename, language=sedml_data_model.ModelLanguage.SBML.value),
+            simulation=sedml_data_model.UniformTimeCourseSimulation(
                 id='simulation',
-                algorithm=sedml_data_model.Algorithm(kisao_id='KISAO_0000448'),
-                initial_time=10.,
-                output_start_time=10.,
-                output_end_time=20.1,
+                algorithm=sedml_data_model.Algorithm(kisao_id='KISAO_0000029'),
+                initial_time=0.,
+                output_start_time=0.,
+                output_end_time=10.,
                 number_of_points=10,
-            )
-
-            variables = []
-
-            with self.assertRaisesRegex(ValueError, 'could not be imported'):
-                core.exec_sed_task(task, variables, TaskLog())
-            task.model.source = os.path.join(os.path.dirname(__file__), 'fixtures', 'BIOMD0000000297.edited', 'ex1', 'BIOMD0000000297.xml')
-
-            with self.assertRaisesRegex(AlgorithmCannotBeSubstitutedException, 'No algorithm can be substituted'):
-                core.exec_sed_task(task, variables, TaskLog())
-            task.simulation.algorithm.kisao_id = 'KISAO_0000029'
-            task.simulation.algorithm.changes = [
-                sedml_data_model.AlgorithmParameterChange(kisao_id='KISAO_0000531'),
-            ]
-
-            with self.assertRaisesRegex(NotImplementedError, 'is not supported. Parameter must'):
-                core.exec_sed_task(task, variables, TaskLog())
-            task.simulation.algorithm.changes[0].kisao_id = 'KISAO_0000488'
-            task.simulation.algorithm.changes[0].new_value = 'abc'
+            ),
+        )
+        variables = [
+            sedml_data_model.Variable(
+                id='A',
+                target="/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='A']",
+                target_namespaces=self.NAMESPACES,
+                task=task,
+            ),
+        ]
+        results, log = core.exec_sed_task(task, variables, TaskLog())
+        self.assertEqual(log.simulator_details['method'], 'gillespy2.solvers.cpp.ssa_c_solver.SSACSolver')
+        self.assertIsInstance(log.simulator_details['arguments']['seed'], int)
 
-            with self.assertRaisesRegex(ValueError, 'not a valid integer'):
-                core.exec_sed_task(task, variables, TaskLog())
-            task.simulation.algorithm.changes[0].new_value = '10'
+        task.simulation.algorithm.changes = [
+            sedml_data_model.AlgorithmParameterChange(kisao_id='KISAO_0000488', new_value=str(log.simulator_details['arguments']['seed'])),
+        ]
+        results_2, _ = core.exec_sed_task(task, variables, TaskLog())
+        numpy.testing.assert_array_equal(results_2['A'], results['A'])
 
-            with self.assertRaisesRegex(NotImplementedError, 'is not supported. Initial time must be 0'):
-                core.exec_sed_task(task, variables, TaskLog())
-            task.simulation.initial_time = 0.
+    def test_get_variable_target_ids(self):
+        model_source = os.path.join(os.path.dirname(__file__), 'fixtures', 'BIOMD0000000297.edited', 'ex1', 'BIOMD0000000297.xml')
+        species_ids = core._sbml_to_gillespy_cached(model_source)[0].get_all_species().keys()
 
-            with self.assertRaisesRegex(NotImplementedError, 'must specify an integer'):
-                core.exec_sed_task(task, variables, TaskLog())
-            task.simulation.output_end_time = 20.
-            variables = [
-                sedml_data_model.Variable(id='var_1', symbol='unsupported', task=task)
-            ]
+        variables = [
+            sedml_data_model.Variable(id='time', symbol=sedml_data_model.Symbol.time),
+            sedml_data_model.Variable(
+                id='BE',
+                target=TARGET_BE,
+                target_namespaces=self.NAMESPACES,
+            ),
+            sedml_data_model.Variable(
+                id='Cdh1',
+                target=TARGET_CDH1,
+                target_namespaces=self.NAMESPACES,
+            ),
+        ]
+        expected_ids = {
+            TARGET_BE: 'BE',
+            TARGET_CDH1: 'Cdh1',
+        }
+        with mock.patch.object(core.validation, 'validate_variable_xpaths', side_effect=core.validation.validate_variable_xpaths) as xpaths:
+            self.assertEqual(core._get_variable_target_ids(variables, model_source, species_ids), expected_ids)
+            xpaths.assert_not_called()
+
+        variables.append(sedml_data_model.Variable(
+            id='R1',
+            target="/sbml:sbml/sbml:model/sbml:listOfReactions/sbml:reaction[@id='R1']",
+            target_namespaces=self.NAMESPACES,
+        ))
+        expected_ids["/sbml:sbml/sbml:model/sbml:listOfReactions/sbml:reaction[@id='R1']"] = 'R1'
+        with mock.patch.object(core.validation, 'validate_variable_xpaths', side_effect=core.validation.validate_variable_xpaths) as xpaths:
+            self.assertEqual(core._get_variable_target_ids(variables, model_source, species_ids), expected_ids)
+            xpaths.assert_called_once()
 
-            with self.assertRaisesRegex(NotImplementedError, 'Symbols must be'):
-                core.exec_sed_task(task, variables, TaskLog())
-            variables = [
-                sedml_data_model.Variable(id='var_1', symbol=sedml_data_model.Symbol.time, task=task),
-                sedml_data_model.Variable(id='var_2', target='/invalid:target', target_namespaces={'invalid': 'invalid'}, task=task),
-            ]
+        # targets whose prefix is mapped to the namespace of a different version of SBML than that of the model
+        variables = [
+            sedml_data_model.Variable(
+                id='BE',
+                target=TARGET_BE,
+                target_namespaces={'sbml': 'http://www.sbml.org/sbml/level3/version1/core'},
+            ),
+        ]
+        with mock.patch.object(core.validation, 'validate_variable_xpaths', side_effect=core.validation.validate_variable_xpaths) as xpaths:
+            with self.assertRaisesRegex(ValueError, 'XPaths must reference unique objects'):
+                core._get_variable_target_ids(variables, model_source, species_ids)
+            xpaths.assert_called_once()
 
-            with self.assertRaisesRegex(ValueError, 'XPaths must reference unique objects.'):
-                core.exec_sed_task(task, variables, TaskLog())
-            variables = [
-                sedml_data_model.Variable(id='var_1', symbol=sedml_data_model.Symbol.time, task=task),
-                sedml_data_model.Variable(
-                    id='BE',
-                    target="/sbml:sbml/sbml:model/sbml:listOfReactions/sbml:reaction[@id='R1']",
-                    target_namespaces=self.NAMESPACES,
-                    task=task
-                ),
+    def test_exec_sed_task_errors(self):
+        invalid_model_filename = os.path.join(self.dirname, 'invalid-model.xml')
+        with open(invalid_model_filename, 'w') as file:
+            file.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>')
+            file.write('<sbml2 xmlns="http://www.sbml.org/sbml/level2/version4" level="2" version="4">')
+            file.write('  <model id="model">')
+            file.write('  </model>')
+            file.write('</sbml2>')
+
+        def set_algorithm_changes(task, kisao_id, new_value=None):
+            task.simulation.algorithm.changes = [
+                sedml_data_model.AlgorithmParameterChange(kisao_id=kisao_id, new_value=new_value),
             ]
 
-            with self.assertRaisesRegex(ValueError, 'Targets must have'):
-                core.exec_sed_task(task, variables, TaskLog())
-            variables = [
-                sedml_data_model.Variable(
-                    id='time',
-                    symbol=sedml_data_model.Symbol.time,
-                    task=task
-                ),
-                sedml_data_model.Variable(
-                    id='BE',
-                    target="/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='BE']",
-                    target_namespaces=self.NAMESPACES,
-                    task=task,
-                ),
-                sedml_data_model.Variable(
-                    id='Cdh1',
-                    target='/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id="Cdh1"]',
-                    target_namespaces=self.NAMESPACES,
-                    task=task,
-                ),
-                sedml_data_model.Variable(
-                    id='Cdc20',
-                    target="/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='Cdc20']",
-                    target_namespaces=self.NAMESPACES,
-                    task=task,
-                ),
-            ]
+        cases = [
+            (lambda task, variables: setattr(task.simulation.algorithm, 'kisao_id', 'KISAO_0000448'),
+             core._validate_sed_task, AlgorithmCannotBeSubstitutedException, 'No algorithm can be substituted'),
+            (lambda task, variables: set_algorithm_changes(task, 'KISAO_0000531'),
+             core._validate_sed_task, NotImplementedError, 'is not supported. Parameter must'),
+            (lambda task, variables: set_algorithm_changes(task, 'KISAO_0000488', 'abc'),
+             core._validate_sed_task, ValueError, 'not a valid integer'),
+            (lambda task, variables: setattr(task.simulation, 'initial_time', 10.),
+             core._validate_sed_task, NotImplementedError, 'is not supported. Initial time must be 0'),
+            (lambda task, variables: setattr(task.simulation, 'output_end_time', 20.1),
+             core._validate_sed_task, NotImplementedError, 'must specify an integer'),
+            (lambda task, variables: variables.append(sedml_data_model.Variable(id='var_1', symbol='unsupported', task=task)),
+             core._validate_sed_task, NotImplementedError, 'Symbols must be'),
+            (lambda task, variables: setattr(task.model, 'source', invalid_model_filename),
+             core.exec_sed_task, ValueError, 'could not be imported'),
+            (lambda task, variables: variables.append(sedml_data_model.Variable(
+                id='var_1', target='/invalid:target', target_namespaces={'invalid': 'invalid'}, task=task)),
+             core.exec_sed_task, ValueError, 'XPaths must reference unique objects.'),
+            (lambda task, variables: variables.append(sedml_data_model.Variable(
+                id='var_1', target="/sbml:sbml/sbml:model/sbml:listOfReactions/sbml:reaction[@id='R1']",
+                target_namespaces=self.NAMESPACES, task=task)),
+             core.exec_sed_task, ValueError, 'Targets must have'),
+        ]
 
+        with mock.patch.dict('os.environ', {'ALGORITHM_SUBSTITUTION_POLICY': 'NONE'}):
+            for i_case, (mutate, exec_task, exception, regex) in enumerate(cases):
+                with self.subTest(case=i_case, message=regex):
+                    task, variables = self._build_valid_task()
+                    mutate(task, variables)
+                    with self.assertRaisesRegex(exception, regex):
+                        exec_task(task, variables)
+
+            task, variables = self._build_valid_task()
             variable_results, _ = core.exec_sed_task(task, variables, TaskLog())
 
             self.assertTrue(sorted(variable_results.keys()), sorted([var.id for var in variables]))
             self.assertEqual(variable_results[variables[0].id].shape, (task.simulation.number_of_points + 1,))
-            numpy.testing.assert_almost_equal(
-                variable_results['time'],
-                numpy.linspace(task.simulation.output_start_time, task.simulation.output_end_time, task.simulation.number_of_points + 1),
-            )
+            numpy.testing.assert_allclose(variable_results['time'], self._expected_time(task.simulation), rtol=0, atol=1e-7)
 
         # algorithm substitution
         task = sedml_data_model.Task(
@@ -248,7 +490,7 @@ class TestCase(unittest.TestCase):
         task.simulation.algorithm.changes[0].new_value = 'not a number'
         with mock.patch.dict('os.environ', {'ALGORITHM_SUBSTITUTION_POLICY': 'NONE'}):
             with self.assertRaisesRegex(ValueError, 'is not a valid'):
-                core.exec_sed_task(task, variables, TaskLog())
+                core._validate_sed_task(task, variables)
 
         with mock.patch.dict('os.environ', {'ALGORITHM_SUBSTITUTION_POLICY': 'SIMILAR_VARIABLES'}):
             with self.assertWarnsRegex(BioSimulatorsWarning, 'Unsuported value'):
@@ -257,14 +499,14 @@ class TestCase(unittest.TestCase):
         task.simulation.algorithm.changes[0].kisao_id = 'KISAO_0000531'
         with mock.patch.dict('os.environ', {'ALGORITHM_SUBSTITUTION_POLICY': 'NONE'}):
             with self.assertRaisesRegex(NotImplementedError, 'is not supported'):
-                core.exec_sed_task(task, variables, TaskLog())
+                core._validate_sed_task(task, variables)
 
         with mock.patch.dict('os.environ', {'ALGORITHM_SUBSTITUTION_POLICY': 'SIMILAR_VARIABLES'}):
             with self.assertWarnsRegex(BioSimulatorsWarning, 'was ignored because it is not supported'):
                 core.exec_sed_task(task, variables, TaskLog())
 
     def test_exec_sedml_docs_in_combine_archive(self):
-        doc, archive_filename = self._build_combine_archive()
+        doc, archive_filename = self._copy_default_archive()
 
         out_dir = os.path.join(self.dirname, 'out')
         core.exec_sedml_docs_in_combine_archive(archive_filename, out_dir,
@@ -278,7 +520,13 @@ class TestCase(unittest.TestCase):
         self._assert_combine_archive_outputs(doc, out_dir)
 
     def test_exec_sedml_docs_in_combine_archive_with_all_algorithms(self):
-        for alg in gen_algorithms_from_specs(os.path.join(os.path.dirname(__file__), '..', 'biosimulators.json')).values():
+        archive_dirname = os.path.join(self.dirname, 'archive')
+        os.mkdir(archive_dirname)
+
+        # the archives are independent; optionally build them all and then execute them in parallel
+        parallel = os.getenv('TEST_PARALLEL_ALGORITHMS', '0').lower() in ['1', 'true']
+        runs = []
+        for alg in copy.deepcopy(self._algorithms).values():
             alg_props = KISAO_ALGORITHM_MAP[alg.kisao_id]
             alg.changes = []
             for param_kisao_id, param_props in alg_props.parameters.items():
@@ -293,7 +541,7 @@ class TestCase(unittest.TestCase):
                     kisao_id=param_kisao_id,
                     new_value=new_value,
                 ))
-            doc, archive_filename = self._build_combine_archive(algorithm=alg)
+            doc, archive_filename = self._build_combine_archive(self.dirname, algorithm=alg, archive_dirname=archive_dirname)
 
             variables = []
             for data_gen in doc.data_generators:
@@ -315,51 +563,107 @@ class TestCase(unittest.TestCase):
                         kisao_id=param_kisao_id,
                         new_value=new_value,
                     ))
-            doc, archive_filename = self._build_combine_archive(algorithm=alg)
+            doc, archive_filename = self._build_combine_archive(self.dirname, algorithm=alg, archive_dirname=archive_dirname)
 
             out_dir = os.path.join(self.dirname, alg.kisao_id)
-            core.exec_sedml_docs_in_combine_archive(archive_filename, out_dir,
-                                                    report_formats=[
-                                                        report_data_model.ReportFormat.h5,
-                                                        report_data_model.ReportFormat.csv,
-                                                    ],
-                                                    bundle_outputs=True,
-                                                    keep_individual_outputs=True)
+            if parallel:
+                runs.append((doc, archive_filename, out_dir))
+            else:
+                self._assert_combine_archive_outputs(doc, _exec_combine_archive(archive_filename, out_dir))
+                shutil.rmtree(out_dir)
+                os.remove(archive_filename)
+
+        if parallel:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                futures = [
+                    executor.submit(_exec_combine_archive, archive_filename, out_dir)
+                    for doc, archive_filename, out_dir in runs
+                ]
+                for (doc, archive_filename, out_dir), future in zip(runs, futures):
+                    self._assert_combine_archive_outputs(doc, future.result())
+                    shutil.rmtree(out_dir)
+                    os.remove(archive_filename)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _cached_default_archive(cls):
+        return cls._build_combine_archive(tempfile.mkdtemp(dir=cls._root))
+
+    def _build_valid_task(self):
+        task = sedml_data_model.Task(id='task')
+        task.model = sedml_data_model.Model(
+            id='model',
+            source=os.path.join(os.path.dirname(__file__), 'fixtures', 'BIOMD0000000297.edited', 'ex1', 'BIOMD0000000297.xml'),
+            language=sedml_data_model.ModelLanguage.SBML.value,
+            changes=[],
+        )
+        task.simulation = sedml_data_model.UniformTimeCourseSimulation(
+            id='simulation',
+            algorithm=sedml_data_model.Algorithm(
+                kisao_id='KISAO_0000029',
+                changes=[
+                    sedml_data_model.AlgorithmParameterChange(kisao_id='KISAO_0000488', new_value='10'),
+                ],
+            ),
+            initial_time=0.,
+            output_start_time=10.,
+            output_end_time=20.,
+            number_of_points=10,
+        )
 
-            self._assert_combine_archive_outputs(doc, out_dir)
+        variables = [
+            sedml_data_model.Variable(id='time', symbol=sedml_data_model.Symbol.time, task=task),
+            sedml_data_model.Variable(id='BE', target=TARGET_BE, target_namespaces=self.NAMESPACES, task=task),
+            sedml_data_model.Variable(id='Cdh1', target=TARGET_CDH1, target_namespaces=self.NAMESPACES, task=task),
+            sedml_data_model.Variable(id='Cdc20', target=TARGET_CDC20, target_namespaces=self.NAMESPACES, task=task),
+        ]
 
-    def _build_combine_archive(self, algorithm=None):
-        doc = self._build_sed_doc(algorithm=algorithm)
+        return task, variables
 
-        archive_dirname = os.path.join(self.dirname, 'archive')
+    def _copy_default_archive(self):
+        doc, src_archive_filename = self._cached_default_archive()
+        archive_filename = os.path.join(self.dirname, 'archive.omex')
+        _link_or_copy(src_archive_filename, archive_filename)
+        return (doc, archive_filename)
+
+    @classmethod
+    def _build_combine_archive(cls, dirname, algorithm=None, archive_dirname=None):
+        doc = cls._build_sed_doc(algorithm=algorithm)
+
+        if archive_dirname is None:
+            archive_dirname = os.path.join(dirname, 'archive')
         if not os.path.isdir(archive_dirname):
             os.mkdir(archive_dirname)
 
+        # the model is the same for every archive; only place it once in a reused staging directory
         model_filename = os.path.join(archive_dirname, 'model_1.xml')
-        shutil.copyfile(
-            os.path.join(os.path.dirname(__file__), 'fixtures', 'BIOMD0000000297.edited', 'ex1', 'BIOMD0000000297.xml'),
-            model_filename)
+        if not os.path.isfile(model_filename):
+            _link_or_copy(
+                os.path.join(os.path.dirname(__file__), 'fixtures', 'BIOMD0000000297.edited', 'ex1', 'BIOMD0000000297.xml'),
+                model_filename)
 
         sim_filename = os.path.join(archive_dirname, 'sim_1.sedml')
         SedmlSimulationWriter().run(doc, sim_filename)
 
-        updated = datetime.datetime(2020, 1, 2, 1, 2, 3, tzinfo=dateutil.tz.tzutc())
-        archive = combine_data_model.CombineArchive(
-            contents=[
-                combine_data_model.CombineArchiveContent(
-                    'model_1.xml', combine_data_model.CombineArchiveContentFormat.SBML.value, updated=updated),
-                combine_data_model.CombineArchiveContent(
-                    'sim_1.sedml', combine_data_model.CombineArchiveContentFormat.SED_ML.value, updated=updated),
-            ],
-            updated=updated,
-        )
-        archive_filename = os.path.join(self.dirname,
+        contents = [
+            ('model_1.xml', combine_data_model.CombineArchiveContentFormat.SBML.value),
+            ('sim_1.sedml', combine_data_model.CombineArchiveContentFormat.SED_ML.value),
+        ]
+        manifest = MANIFEST_TEMPLATE.format('\n'.join(
+            '  <content location="./{}" format="{}"/>'.format(location, format) for location, format in contents))
+
+        # write the archive directly, rather than staging a manifest and metadata on disk
+        archive_filename = os.path.join(dirname,
                                         'archive.omex' if algorithm is None else 'archive-{}.omex'.format(algorithm.kisao_id))
-        CombineArchiveWriter().run(archive, archive_dirname, archive_filename)
+        with zipfile.ZipFile(archive_filename, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+            archive.writestr('manifest.xml', manifest)
+            for location, _ in contents:
+                archive.write(os.path.join(archive_dirname, location), location)
 
         return (doc, archive_filename)
 
-    def _build_sed_doc(self, algorithm=None):
+    @classmethod
+    def _build_sed_doc(cls, algorithm=None):
         if algorithm is None:
             algorithm = sedml_data_model.Algorithm(
                 kisao_id='KISAO_0000029',
@@ -407,8 +711,8 @@ class TestCase(unittest.TestCase):
             variables=[
                 sedml_data_model.Variable(
                     id='var_BE',
-                    target="/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='BE']",
-                    target_namespaces=self.NAMESPACES,
+                    target=TARGET_BE,
+                    target_namespaces=cls.NAMESPACES,
                     task=doc.tasks[0],
                 ),
             ],
@@ -419,8 +723,8 @@ class TestCase(unittest.TestCase):
             variables=[
                 sedml_data_model.Variable(
                     id='var_Cdh1',
-                    target='/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id="Cdh1"]',
-                    target_namespaces=self.NAMESPACES,
+                    target=TARGET_CDH1,
+                    target_namespaces=cls.NAMESPACES,
                     task=doc.tasks[0],
                 ),
             ],
@@ -431,8 +735,8 @@ class TestCase(unittest.TestCase):
             variables=[
                 sedml_data_model.Variable(
                     id='var_Cdc20',
-                    target="/sbml:sbml/sbml:model/sbml:listOfSpecies/sbml:species[@id='Cdc20']",
-                    target_namespaces=self.NAMESPACES,
+                    target=TARGET_CDC20,
+                    target_namespaces=cls.NAMESPACES,
                     task=doc.tasks[0],
                 ),
             ],
@@ -456,36 +760,25 @@ class TestCase(unittest.TestCase):
         self.assertEqual(set(['reports.h5', 'reports.zip', 'sim_1.sedml']).difference(set(os.listdir(out_dir))), set())
 
         report = doc.outputs[0]
-
-        # check HDF report
-        report_results = ReportReader().run(report, out_dir, 'sim_1.sedml/report_1', format=report_data_model.ReportFormat.h5)
-
-        self.assertEqual(sorted(report_results.keys()), sorted([d.id for d in doc.outputs[0].data_sets]))
-
         sim = doc.tasks[0].simulation
-        self.assertEqual(len(report_results[report.data_sets[0].id]), sim.number_of_points + 1)
-        numpy.testing.assert_almost_equal(
-            report_results[report.data_sets[0].id],
-            numpy.linspace(sim.output_start_time, sim.output_end_time, sim.number_of_points + 1),
-        )
 
-        for data_set_result in report_results.values():
-            self.assertFalse(numpy.any(numpy.isnan(data_set_result)))
+        # read HDF and CSV reports
+        with _open_reports(out_dir) as reports_file:
+            h5_report_results = _read_h5_report(reports_file, 'sim_1.sedml/report_1')
+        csv_report_results = ReportReader().run(report, out_dir, 'sim_1.sedml/report_1', format=report_data_model.ReportFormat.csv)
 
-        # check CSV report
-        report_results = ReportReader().run(report, out_dir, 'sim_1.sedml/report_1', format=report_data_model.ReportFormat.csv)
+        expected_time = self._expected_time(sim)
+        for report_results in [h5_report_results, csv_report_results]:
+            self.assertEqual(sorted(report_results.keys()), sorted([d.id for d in doc.outputs[0].data_sets]))
+            self.assertEqual(len(report_results[report.data_sets[0].id]), sim.number_of_points + 1)
 
-        self.assertEqual(sorted(report_results.keys()), sorted([d.id for d in doc.outputs[0].data_sets]))
+            for data_set_result in report_results.values():
+                self.assertFalse(numpy.any(numpy.isnan(data_set_result)))
 
-        sim = doc.tasks[0].simulation
-        self.assertEqual(len(report_results[report.data_sets[0].id]), sim.number_of_points + 1)
-        numpy.testing.assert_almost_equal(
-            report_results[report.data_sets[0].id],
-            numpy.linspace(sim.output_start_time, sim.output_end_time, sim.number_of_points + 1),
-        )
+            numpy.testing.assert_allclose(report_results[report.data_sets[0].id], expected_time, rtol=0, atol=1e-7)
 
-        for data_set_result in report_results.values():
-            self.assertFalse(numpy.any(numpy.isnan(data_set_result)))
+    def _expected_time(self, sim):
+        return _linspace(sim.output_start_time, sim.output_end_time, sim.number_of_points + 1)
 
     def test_raw_cli(self):
         with mock.patch('sys.argv', ['', '--help']):
@@ -494,7 +787,7 @@ class TestCase(unittest.TestCase):
                 self.assertRegex(context.Exception, 'usage: ')
 
     def test_exec_sedml_docs_in_combine_archive_with_cli(self):
-        doc, archive_filename = self._build_combine_archive()
+        doc, archive_filename = self._copy_default_archive()
         out_dir = os.path.join(self.dirname, 'out')
         env = self._get_combine_archive_exec_env()
 
@@ -510,7 +803,10 @@ class TestCase(unittest.TestCase):
         }
 
     def test_exec_sedml_docs_in_combine_archive_with_docker_image(self):
-        doc, archive_filename = self._build_combine_archive()
+        if not _docker_available():
+            self.skipTest('Docker is not available')
+
+        doc, archive_filename = self._copy_default_archive()
         out_dir = os.path.join(self.dirname, 'out')
         docker_image = self.DOCKER_IMAGE
         env = self._get_combine_archive_exec_env()
@@ -531,36 +827,23 @@ class TestCase(unittest.TestCase):
                                                 bundle_outputs=True,
                                                 keep_individual_outputs=True)
 
-        self.assertEqual(set(['reports.zip', 'reports.h5', 'ex1', 'ex2']).difference(set(os.listdir(self.dirname))), set())
-        self.assertEqual(set(os.listdir(os.path.join(self.dirname, 'ex1'))), set(['BIOMD0000000297.sedml']))
-        self.assertEqual(set(os.listdir(os.path.join(self.dirname, 'ex2'))), set(['BIOMD0000000297.sedml']))
-        self.assertEqual(set(os.listdir(os.path.join(self.dirname, 'ex1', 'BIOMD0000000297.sedml'))),
-                         set(['two_species.csv', 'three_species.csv']))
-        self.assertEqual(set(os.listdir(os.path.join(self.dirname, 'ex2', 'BIOMD0000000297.sedml'))),
-                         set(['one_species.csv', 'four_species.csv']))
-
-        archive = ArchiveReader().run(os.path.join(self.dirname, 'reports.zip'))
+        expected_reports = frozenset([
+            'ex1/BIOMD0000000297.sedml/two_species.csv',
+            'ex1/BIOMD0000000297.sedml/three_species.csv',
+            'ex2/BIOMD0000000297.sedml/one_species.csv',
+            'ex2/BIOMD0000000297.sedml/four_species.csv',
+        ])
 
-        self.assertEqual(
-            sorted(file.archive_path for file in archive.files),
-            sorted([
-                'ex1/BIOMD0000000297.sedml/two_species.csv',
-                'ex1/BIOMD0000000297.sedml/three_species.csv',
-                'ex2/BIOMD0000000297.sedml/one_species.csv',
-                'ex2/BIOMD0000000297.sedml/four_species.csv',
-            ]),
-        )
+        tree = _relative_tree(self.dirname)
+        self.assertEqual(set(['reports.zip', 'reports.h5']).difference(tree), set())
+        self.assertEqual(set(path for path in tree if '/' in path), expected_reports)
 
-        report = sedml_data_model.Report(
-            data_sets=[
-                sedml_data_model.DataSet(id='data_set_time_two_species', label='time'),
-                sedml_data_model.DataSet(id='data_set_Cln4', label='Cln4'),
-                sedml_data_model.DataSet(id='data_set_Swe13', label='Swe13'),
-            ]
-        )
-
-        report_results = ReportReader().run(report, self.dirname,
-                                            'ex1/BIOMD0000000297.sedml/two_species',
-                                            format=report_data_model.ReportFormat.h5)
-        self.assertEqual(sorted(report_results.keys()), sorted(['data_set_time_two_species', 'data_set_Cln4', 'data_set_Swe13']))
-        numpy.testing.assert_almost_equal(report_results['data_set_time_two_species'], numpy.linspace(0., 1., 10 + 1))
+        archive = ArchiveReader().run(os.path.join(self.dirname, 'reports.zip'))
+        self.assertEqual(set(file.archive_path for file in archive.files), expected_reports)
+
+        rel_path = 'ex1/BIOMD0000000297.sedml/two_species'
+        with _open_reports(self.dirname) as reports_file:
+            data_set_ids = list(reports_file[rel_path].attrs['sedmlDataSetIds'])
+            time = _read_report_row(reports_file, rel_path, 'data_set_time_two_species')
+        self.assertEqual(sorted(data_set_ids), sorted(['data_set_time_two_species', 'data_set_Cln4', 'data_set_Swe13']))
+        numpy.testing.assert_allclose(time, _linspace(0., 1., 10 + 1), rtol=0, atol=1e-7)